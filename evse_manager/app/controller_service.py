@@ -4,11 +4,14 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import sys
 import time
+from collections import deque
 from datetime import datetime, timezone
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 
 from controller_config import load_runtime_config
 from ha_adapter import HomeAssistantAdapter
@@ -16,9 +19,32 @@ from ha_api import HomeAssistantAPI
 from state_machine import Decision, DeterministicStateMachine, EVSE_STEPS_AMPS, Inputs
 
 UI_STATE_PATH = Path("/data/ui_state.json")
+UI_STATE_TMP_PATH = UI_STATE_PATH.with_name(UI_STATE_PATH.name + ".tmp")
 HISTORY_LIMIT = 180
 
 
+def dump_ui_state(payload: Dict) -> bytes:
+    """Serialize a UI snapshot to compact JSON bytes."""
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def write_ui_state(data: bytes) -> None:
+    """Publish a serialized UI snapshot so readers never see a torn file."""
+    try:
+        fd = os.open(UI_STATE_TMP_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    except FileNotFoundError:
+        UI_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(UI_STATE_TMP_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            # os.write may stop short; only a complete snapshot may be renamed into place.
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(UI_STATE_TMP_PATH, UI_STATE_PATH)
+
+
 def configure_logging(level: str) -> None:
     logging.basicConfig(
         level=getattr(logging, level.upper(), logging.INFO),
@@ -38,7 +64,7 @@ class ControlService:
         self.adapter = HomeAssistantAdapter(self.api, self.runtime_config.entities, self.logger)
         self.machine = DeterministicStateMachine(self.runtime_config.controller)
         self.tick_seconds = self.runtime_config.tick_seconds
-        self.energy_history: List[Dict[str, Optional[float]]] = []
+        self.energy_history: Deque[Dict[str, Optional[float]]] = deque(maxlen=HISTORY_LIMIT)
         self.logger.info(
             "Deterministic FSM online (tick=%ss, inverter limit=%sW)",
             self.tick_seconds,
@@ -148,10 +174,10 @@ class ControlService:
         ui_available_for_ev = self._ui_available_for_ev(inputs, current_watts, derived.region)
         ui_pv_display = self._ui_pv_display(inputs)
         
-        timestamp = datetime.now(timezone.utc).isoformat()
+        now = datetime.now(timezone.utc)
         # Use UI values for history display on graph
         self._append_history(
-            timestamp,
+            now,
             ui_available_for_ev,
             ui_pv_display,
             inputs.inverter_power_w,
@@ -183,9 +209,7 @@ class ControlService:
             "energy_map": self._energy_map(current_watts, target_watts, available_power),
         }
         try:
-            UI_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-            with UI_STATE_PATH.open("w", encoding="utf-8") as handle:
-                json.dump(payload, handle, separators=(",", ":"))
+            write_ui_state(dump_ui_state(payload))
         except Exception:  # noqa: BLE001
             self.logger.exception("Unable to write UI state")
 
@@ -251,7 +275,7 @@ class ControlService:
 
     def _append_history(
         self,
-        timestamp: str,
+        timestamp: datetime,
         available: Optional[float],
         pv: Optional[float],
         load: Optional[float],
@@ -259,7 +283,9 @@ class ControlService:
         target: float,
     ) -> None:
         sample = {
-            "ts": timestamp,
+            "ts": timestamp.isoformat(),
+            # Epoch milliseconds so the dashboard never has to parse ISO strings
+            "ts_ms": int(timestamp.timestamp() * 1000),
             "available": available,
             "pv": pv,
             "load": load,
@@ -267,19 +293,21 @@ class ControlService:
             "target": target,
         }
         self.energy_history.append(sample)
-        if len(self.energy_history) > HISTORY_LIMIT:
-            self.energy_history = self.energy_history[-HISTORY_LIMIT:]
+
+    @cached_property
+    def _evse_steps(self) -> List[Dict[str, float]]:
+        """Step ladder in amps/watts; fixed for the lifetime of the runtime config."""
+        voltage = self.runtime_config.controller.line_voltage_v
+        return [{"amps": amps, "watts": amps * voltage} for amps in EVSE_STEPS_AMPS]
 
     def _energy_map(
         self, current_watts: float, target_watts: float, available_power: Optional[float]
     ) -> Dict[str, object]:
-        steps = [
-            {"amps": amps, "watts": amps * self.runtime_config.controller.line_voltage_v}
-            for amps in EVSE_STEPS_AMPS
-        ]
+        history = list(self.energy_history)
         return {
-            "history": list(self.energy_history[-HISTORY_LIMIT:]),
-            "evse_steps": steps,
+            "history": history,
+            "last_ts_ms": history[-1]["ts_ms"] if history else None,
+            "evse_steps": self._evse_steps,
             "current_watts": current_watts,
             "target_watts": target_watts,
             "available_power": available_power,
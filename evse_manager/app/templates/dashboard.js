@@ -0,0 +1,733 @@
+const FALLBACK = {{ fallback_json | safe }};
+const INGRESS_RE = /^\/api\/hassio_ingress\/[A-Za-z0-9_-]+/;
+const API_PREFIX = (INGRESS_RE.exec(window.location.pathname) || [''])[0];
+const URLS = Object.freeze({ status: API_PREFIX + '/api/status', stream: API_PREFIX + '/api/stream' });
+const CHART_SRC = 'https://cdn.jsdelivr.net/npm/chart.js@4.4.6/dist/chart.umd.min.js';
+const CHART_WORKER_SRC = `
+    importScripts('${CHART_SRC}');
+    const toChartData = values => Array.from(values, value => (value === value ? value : null));
+    let chart = null;
+    let size = null;
+    let pending = null;
+    const applyData = msg => {
+        if (msg.labels) chart.data.labels = msg.labels;
+        msg.series.forEach((values, index) => {
+            chart.data.datasets[index].data = toChartData(values);
+        });
+        chart.update('none');
+    };
+    const loadFont = async (cssUrl, family) => {
+        if (!cssUrl || !self.fonts || typeof FontFace === 'undefined') return;
+        const css = await (await fetch(cssUrl)).text();
+        for (const [, block] of css.matchAll(/@font-face *{([^}]*)}/g)) {
+            const src = /src: *(url[(][^)]+[)])/.exec(block);
+            if (!src || !block.includes(family)) continue;
+            const weight = /font-weight: *([0-9]+)/.exec(block);
+            const range = /unicode-range: *([^;]+);/.exec(block);
+            const descriptors = { weight: weight ? weight[1] : 'normal' };
+            if (range) descriptors.unicodeRange = range[1];
+            self.fonts.add(new FontFace(family, src[1], descriptors));
+        }
+        await self.fonts.load('11px ' + family);
+    };
+    onmessage = event => {
+        const msg = event.data;
+        if (msg.type === 'init') {
+            size = msg;
+            loadFont(msg.fontCss, msg.fontFamily).catch(() => {}).then(() => {
+                chart = new Chart(msg.canvas, msg.config);
+                chart.resize(size.width, size.height);
+                if (pending) applyData(pending);
+                pending = null;
+            });
+        } else if (msg.type === 'resize') {
+            size = msg;
+            if (chart) chart.resize(msg.width, msg.height);
+        } else if (msg.type === 'data') {
+            if (chart) applyData(msg);
+            else pending = { labels: msg.labels || (pending && pending.labels), series: msg.series };
+        }
+    };
+`;
+const CHART_FONT_FAMILY = 'Rajdhani';
+const RESIZE_DEBOUNCE_MS = 150;
+const POLL_BASE_MS = 2000;
+const POLL_IDLE_MAX_MS = 5000;
+// Short enough to feel immediate, long enough to fold rapid tab flips into one fetch.
+const POLL_COALESCE_MS = 150;
+const EVSE_ACTIVE_RE = /(ready|charging|active)/;
+const EVSE_ALERT_RE = /(fault|error|unavailable)/;
+const TIME_FORMAT = new Intl.DateTimeFormat([], { hour: '2-digit', minute: '2-digit', second: '2-digit' });
+const TIME_LABEL_CACHE_SIZE = 64;
+// Newest samples listed in the temporal trace, taken from the tail of the history.
+const TIMELINE_LIMIT = 8;
+const EVSE_STATE_CACHE_SIZE = 16;
+const RAIL_CLASS = { base: 'rail-step', active: 'rail-step active', target: 'rail-step target' };
+const CONSTRAINT_CLASS = { clear: 'constraint', alert: 'constraint alert' };
+const CONSTRAINT_LABELS = Object.freeze({
+    car_unplugged: 'car unplugged',
+    auto_disabled: 'auto disabled',
+    inverter_limit: 'inverter limit',
+    vehicle_waiting: 'vehicle waiting',
+});
+const BATTERY_FLOW_LABELS = Object.freeze({ charging: 'IN', discharging: 'OUT' });
+const DOM = {};
+const lastText = new WeakMap();
+const lastClassState = new WeakMap();
+const timeLabelCache = new Map();
+const evseStateCache = new Map();
+const railNodes = [];
+let railKey = null;
+let constraintKey = null;
+let timelineNodes = new Map();
+let timelineEmpty = false;
+let energyChart = null;
+let chartWorker = null;
+let pendingChartData = null;
+let chartLabelCount = -1;
+let lastEnergyFingerprint = null;
+let pendingRender = null;
+let renderFrame = 0;
+let pollDelay = POLL_BASE_MS;
+let pollTimer = 0;
+let statusInFlight = null;
+let statusEtag = null;
+let streaming = false;
+let eventSource = null;
+let streamState = null;
+
+function cacheDom() {
+    const ids = {
+        statusChip: 'status-chip',
+        modeValue: 'mode-value',
+        modeRegionChip: 'mode-region-chip',
+        modeSubtext: 'mode-subtext',
+        modeStateChip: 'mode-state-chip',
+        autoState: 'auto-state',
+        stateHelp: 'state-help',
+        chargerStatus: 'charger-status',
+        limiterLabel: 'limiter-label',
+        currentAmps: 'current-amps',
+        targetAmps: 'target-amps',
+        stepIndicator: 'step-indicator',
+        stepRail: 'step-rail',
+        energyChart: 'energy-chart',
+        availableChip: 'available-chip',
+        pvChip: 'pv-chip',
+        loadChip: 'load-chip',
+        evDrawChip: 'ev-draw-chip',
+        controlTargetLabel: 'control-target-label',
+        controlReasonLabel: 'control-reason-label',
+        timeline: 'timeline',
+        fsmStatusChip: 'fsm-status-chip',
+        evseStatusChip: 'evse-status-chip',
+        autoHelp: 'auto-help',
+        constraintChips: 'constraint-chips',
+        batteryBeacon: 'battery-beacon',
+        batteryBeaconLabel: 'battery-beacon-label',
+        batterySoc: 'battery-soc',
+        batteryPower: 'battery-power',
+        batteryGuard: 'battery-guard',
+    };
+    Object.entries(ids).forEach(([key, id]) => {
+        DOM[key] = document.getElementById(id);
+    });
+}
+
+function chartConfig(platformOptions) {
+    return {
+        type: 'line',
+        data: {
+            labels: [],
+            datasets: [
+                { label: 'Available', data: [], borderColor: '#f7a21c', backgroundColor: 'rgba(247,162,28,0.15)', fill: true, tension: 0.35 },
+                { label: 'PV', data: [], borderColor: '#5de0ec', borderDash: [8,4], tension: 0.35 },
+                { label: 'EV Draw', data: [], borderColor: '#f04c7c', tension: 0.35 }
+            ]
+        },
+        options: {
+            animation: false,
+            maintainAspectRatio: false,
+            ...platformOptions,
+            plugins: { 
+                legend: { 
+                    labels: { 
+                        color: 'rgba(244,242,255,0.8)', 
+                        font: { family: CHART_FONT_FAMILY, size: 11 }
+                    } 
+                } 
+            },
+            scales: {
+                x: {
+                    display: false
+                },
+                y: { 
+                    ticks: { 
+                        color: 'rgba(244,242,255,0.6)',
+                        font: { size: 10 }
+                    }, 
+                    grid: { color: 'rgba(255,255,255,0.05)' } 
+                }
+            }
+        }
+    };
+}
+
+function debounce(fn, delay) {
+    let timer = 0;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), delay);
+    };
+}
+
+function loadScript(src) {
+    return new Promise((resolve, reject) => {
+        const script = document.createElement('script');
+        script.src = src;
+        script.onload = resolve;
+        script.onerror = reject;
+        document.head.appendChild(script);
+    });
+}
+
+function chartSize() {
+    return { width: DOM.energyChart.clientWidth, height: DOM.energyChart.clientHeight };
+}
+
+function initWorkerChart(canvas) {
+    const url = URL.createObjectURL(new Blob([CHART_WORKER_SRC], { type: 'text/javascript' }));
+    const worker = new Worker(url);
+    worker.onerror = error => console.error('Chart worker failed', error);
+    const offscreen = canvas.transferControlToOffscreen();
+    const config = chartConfig({ responsive: false, devicePixelRatio: window.devicePixelRatio || 1 });
+    // Workers cannot see the page's web fonts; the worker registers the legend font itself
+    // from the same stylesheet before drawing, and falls back to the default font if that fails.
+    const fontCss = document.querySelector('link[href*="fonts.googleapis.com/css"]')?.href;
+    worker.postMessage(
+        { type: 'init', canvas: offscreen, config, fontCss, fontFamily: CHART_FONT_FAMILY, ...chartSize() },
+        [offscreen],
+    );
+    // Window drags fire resize callbacks every frame; only the settled size matters.
+    const postResize = debounce(() => worker.postMessage({ type: 'resize', ...chartSize() }), RESIZE_DEBOUNCE_MS);
+    new ResizeObserver(postResize).observe(canvas);
+    return worker;
+}
+
+function initChart() {
+    const canvas = DOM.energyChart;
+    if (!canvas) return;
+    // Render off the main thread where OffscreenCanvas is available (not older Safari).
+    if (typeof Worker !== 'undefined' && typeof ResizeObserver !== 'undefined'
+        && 'transferControlToOffscreen' in canvas) {
+        try {
+            chartWorker = initWorkerChart(canvas);
+            flushPendingChart();
+            return;
+        } catch (error) {
+            console.error('Offscreen chart unavailable, rendering inline', error);
+        }
+    }
+    loadScript(CHART_SRC).then(() => {
+        energyChart = new Chart(canvas, chartConfig({ responsive: true }));
+        flushPendingChart();
+    }).catch(error => console.error('Chart.js failed to load', error));
+}
+
+function initChartWhenVisible() {
+    const canvas = DOM.energyChart;
+    if (!canvas) return;
+    if (typeof IntersectionObserver === 'undefined') {
+        initChart();
+        return;
+    }
+    // Defer the Chart.js download until the chart is actually on screen.
+    const observer = new IntersectionObserver(entries => {
+        if (!entries.some(entry => entry.isIntersecting)) return;
+        observer.disconnect();
+        initChart();
+    });
+    observer.observe(canvas);
+}
+
+function flushPendingChart() {
+    if (!pendingChartData) return;
+    const { labels, series } = pendingChartData;
+    pendingChartData = null;
+    renderChart(labels, series);
+}
+
+function setText(el, value) {
+    if (!el || lastText.get(el) === value) return;
+    lastText.set(el, value);
+    // Updating a lone text node in place avoids textContent's remove-and-insert of children.
+    const node = el.firstChild;
+    if (node && node === el.lastChild && node.nodeType === Node.TEXT_NODE) {
+        node.nodeValue = value;
+    } else {
+        el.textContent = value;
+    }
+}
+
+function setClass(el, name, enabled) {
+    if (!el) return;
+    let state = lastClassState.get(el);
+    if (!state) {
+        state = {};
+        lastClassState.set(el, state);
+    }
+    if (state[name] === enabled) return;
+    state[name] = enabled;
+    el.classList.toggle(name, enabled);
+}
+
+function fmt(value, suffix = '') {
+    // value === value is false only for NaN
+    return typeof value === 'number' && value === value ? Math.round(value) + suffix : '--' + suffix;
+}
+
+function findStepIndex(steps, amps) {
+    if (!steps?.length || amps == null) return -1;
+    const rounded = Math.round(amps);
+    return steps.findIndex(step => Math.round(step.amps) === rounded);
+}
+
+function constraintLabel(factor) {
+    return CONSTRAINT_LABELS[factor] || factor.replace(/_/g, ' ');
+}
+
+function textDiv(className, text) {
+    const div = document.createElement('div');
+    div.className = className;
+    div.textContent = text;
+    return div;
+}
+
+function buildRail(rail, steps) {
+    railNodes.length = 0;
+    const frag = document.createDocumentFragment();
+    steps.forEach((step, index) => {
+        const div = document.createElement('div');
+        div.className = 'rail-step';
+        const small = document.createElement('small');
+        small.textContent = index;
+        div.append(small, `${step.amps}A`);
+        frag.appendChild(div);
+        railNodes.push(div);
+    });
+    rail.replaceChildren(frag);
+}
+
+function renderRail(steps, currentAmps, targetAmps) {
+    const rail = DOM.stepRail;
+    if (!steps?.length) {
+        if (railKey !== '') {
+            rail.replaceChildren(textDiv(RAIL_CLASS.base, 'NO STEPS'));
+            railNodes.length = 0;
+            railKey = '';
+        }
+        return;
+    }
+    // Only rebuild the pills when the step set changes; otherwise just move the highlights.
+    const key = steps.map(step => step.amps).join(',');
+    if (key !== railKey) {
+        buildRail(rail, steps);
+        railKey = key;
+    }
+    const currentIndex = findStepIndex(steps, currentAmps);
+    const targetIndex = findStepIndex(steps, targetAmps);
+    railNodes.forEach((div, index) => {
+        const cls = index === currentIndex ? RAIL_CLASS.active
+            : index === targetIndex ? RAIL_CLASS.target
+            : RAIL_CLASS.base;
+        if (div.className !== cls) div.className = cls;
+    });
+    setText(DOM.stepIndicator, currentIndex >= 0 ? `STEP ${currentIndex}` : 'STEP ?');
+}
+
+function timeLabel(sample) {
+    const key = sample.ts_ms ?? sample.ts;
+    if (key == null) return '--';
+    // Each sample stays in the trace for several ticks, so format its time once.
+    let label = timeLabelCache.get(key);
+    if (label === undefined) {
+        const date = new Date(key);
+        label = Number.isNaN(date.getTime()) ? '--' : TIME_FORMAT.format(date);
+        timeLabelCache.set(key, label);
+        if (timeLabelCache.size > TIME_LABEL_CACHE_SIZE) {
+            timeLabelCache.delete(timeLabelCache.keys().next().value);
+        }
+    }
+    return label;
+}
+
+function timelineRow(label, detail) {
+    const li = document.createElement('li');
+    const time = document.createElement('span');
+    time.textContent = label;
+    const payload = document.createElement('span');
+    payload.textContent = detail;
+    li.append(time, payload);
+    return li;
+}
+
+function timelineItem(sample) {
+    return timelineRow(
+        timeLabel(sample),
+        `Avail ${fmt(sample.available, 'W')} / Curr ${fmt(sample.current, 'W')} / Target ${fmt(sample.target, 'W')}`,
+    );
+}
+
+function updateTimeline(timeline) {
+    const list = DOM.timeline;
+    if (!timeline?.length) {
+        if (!timelineEmpty) {
+            list.replaceChildren(timelineRow('No telemetry yet', '--'));
+            timelineNodes = new Map();
+            timelineEmpty = true;
+        }
+        return;
+    }
+    if (timelineEmpty) {
+        list.replaceChildren();
+        timelineEmpty = false;
+    }
+    // Samples are immutable once recorded, so rows are keyed by timestamp and reused
+    // as they slide down the trace; only the newest row is built per tick.
+    const next = new Map();
+    timeline.forEach((sample, index) => {
+        const key = sample.ts_ms ?? sample.ts ?? `#${index}`;
+        next.set(key, timelineNodes.get(key) || timelineItem(sample));
+    });
+    timelineNodes.forEach((li, key) => {
+        if (!next.has(key)) li.remove();
+    });
+    let ref = list.firstChild;
+    next.forEach(li => {
+        if (li === ref) {
+            ref = ref.nextSibling;
+        } else {
+            list.insertBefore(li, ref);
+        }
+    });
+    timelineNodes = next;
+}
+
+function updateConstraints(limiting) {
+    // The factor set rarely changes; leave the chips alone until it does.
+    const key = limiting.join('|');
+    if (key === constraintKey) return;
+    constraintKey = key;
+    const frag = document.createDocumentFragment();
+    if (!limiting.length) {
+        frag.appendChild(textDiv(CONSTRAINT_CLASS.clear, 'CLEAR CHANNEL'));
+    }
+    limiting.forEach(item => {
+        const label = constraintLabel(item);
+        frag.appendChild(textDiv(CONSTRAINT_CLASS.alert, label));
+    });
+    DOM.constraintChips.replaceChildren(frag);
+}
+
+function toChartData(values) {
+    return Array.from(values, value => (value === value ? value : null));
+}
+
+function renderChart(labels, series) {
+    if (chartWorker) {
+        // Hand the sample buffers to the worker without copying them.
+        chartWorker.postMessage({ type: 'data', labels, series }, series.map(values => values.buffer));
+    } else if (energyChart) {
+        if (labels) energyChart.data.labels = labels;
+        series.forEach((values, index) => {
+            energyChart.data.datasets[index].data = toChartData(values);
+        });
+        energyChart.update('none');
+    } else {
+        pendingChartData = { labels: labels || pendingChartData?.labels, series };
+    }
+}
+
+function pumpChart(history, availablePower, pvPower, chargingPower) {
+    // Labels are blank since the x-axis is hidden; only send a new array when the count changes.
+    const labels = history.length === chartLabelCount ? null : new Array(history.length).fill('');
+    chartLabelCount = history.length;
+    // Fill all three series in one pass; NaN marks a gap and becomes null again in Chart.js.
+    const count = history.length;
+    const available = new Float64Array(count);
+    const pv = new Float64Array(count);
+    const draw = new Float64Array(count);
+    for (let i = 0; i < count; i++) {
+        const sample = history[i];
+        available[i] = sample.available ?? availablePower ?? NaN;
+        pv[i] = sample.pv ?? pvPower ?? NaN;
+        draw[i] = sample.current ?? chargingPower ?? NaN;
+    }
+    renderChart(labels, [available, pv, draw]);
+}
+
+function updateMetrics(data) {
+    setText(DOM.statusChip, (data.status || 'idle').toUpperCase());
+    setText(DOM.modeValue, (data.mode || 'auto').toUpperCase());
+    setText(DOM.autoState, data.auto_state_label || '--');
+    setText(DOM.stateHelp, data.auto_state_help || 'Awaiting telemetry');
+    setText(DOM.chargerStatus, (data.charger_status || '--').toUpperCase());
+    setText(DOM.limiterLabel, constraintLabel(data.limiting_factors?.[0] || 'Clear channel'));
+    setText(DOM.currentAmps, `${data.current_amps ?? 0} A`);
+    setText(DOM.targetAmps, `${data.target_current ?? 0} A`);
+    setText(DOM.autoHelp, data.auto_state_help || 'No guidance available.');
+    updateModeChips(data);
+    updateStatusChips(data);
+    updateControlNarrative(data);
+}
+
+function updateModeChips(data) {
+    const regionChip = DOM.modeRegionChip;
+    const modeStateChip = DOM.modeStateChip;
+    const modeSubtext = DOM.modeSubtext;
+    if (regionChip) {
+        const region = (data.region || 'main').toUpperCase();
+        setText(regionChip, region);
+        setClass(regionChip, 'probe', region === 'PROBE');
+    }
+    if (modeStateChip) {
+        const state = (data.mode_state || '--').replace(/_/g, ' ').toUpperCase();
+        setText(modeStateChip, state);
+    }
+    if (modeSubtext) {
+        setText(modeSubtext, data.mode_state ? data.mode_state.replace(/_/g, ' ').toUpperCase() : 'DETERMINISTIC FSM');
+    }
+}
+
+function updateControlNarrative(data) {
+    const target = DOM.controlTargetLabel;
+    const reason = DOM.controlReasonLabel;
+    if (target) {
+        const label = data.control_target_label || 'Target unavailable';
+        setText(target, `Target: ${label}`);
+    }
+    if (reason) {
+        const why = data.control_reason_label || 'Awaiting telemetry';
+        setText(reason, `Reason: ${why}`);
+    }
+}
+
+function updateStatusChips(data) {
+    const fsmChip = DOM.fsmStatusChip;
+    if (fsmChip) {
+        setText(fsmChip, `FSM | ${(data.auto_state_label || '--').toUpperCase()}`);
+        setClass(fsmChip, 'active', (data.auto_state || '').includes('charging'));
+        setClass(fsmChip, 'alert', false);
+    }
+    const evseChip = DOM.evseStatusChip;
+    if (evseChip) {
+        const evse = evseState(data.charger_status);
+        setText(evseChip, evse.label);
+        setClass(evseChip, 'active', evse.active);
+        setClass(evseChip, 'alert', evse.alert);
+    }
+}
+
+function evseState(status) {
+    // The charger reports a handful of states; classify each once instead of every tick.
+    const key = status || 'unknown';
+    let state = evseStateCache.get(key);
+    if (state === undefined) {
+        const normalized = key.toLowerCase();
+        state = {
+            label: `EVSE | ${key.toUpperCase()}`,
+            active: EVSE_ACTIVE_RE.test(normalized),
+            alert: EVSE_ALERT_RE.test(normalized),
+        };
+        evseStateCache.set(key, state);
+        if (evseStateCache.size > EVSE_STATE_CACHE_SIZE) {
+            evseStateCache.delete(evseStateCache.keys().next().value);
+        }
+    }
+    return state;
+}
+
+function updateEnergyChips(data) {
+    // Display "Available for EV" - show "Probing" when in PROBE region (SOC >= 95%)
+    const availableChip = DOM.availableChip;
+    if (data.ui_available_for_ev === null || data.ui_available_for_ev === undefined) {
+        const region = (data.region || '').toUpperCase();
+        setText(availableChip, region === 'PROBE' ? 'Probing' : 'Unknown');
+    } else {
+        setText(availableChip, fmt(data.ui_available_for_ev, ' W'));
+    }
+
+    // Display PV Array (Total PV Power)
+    const pvChip = DOM.pvChip;
+    const pv = data.ui_pv_display ?? data.pv_power_w ?? data.total_pv_power;
+    setText(pvChip, fmt(pv, ' W'));
+
+    setText(DOM.loadChip, fmt(data.inverter_power, ' W'));
+    setText(DOM.evDrawChip, fmt(data.charging_power, ' W'));
+}
+
+function updateBattery(data) {
+    const battery = data.battery || {};
+    const beacon = DOM.batteryBeacon;
+    const beaconLabel = DOM.batteryBeaconLabel;
+    const direction = (battery.direction || 'idle').toLowerCase();
+    if (beacon) {
+        setClass(beacon, 'charging', direction === 'charging');
+        setClass(beacon, 'discharging', direction === 'discharging');
+    }
+    if (beaconLabel) {
+        setText(beaconLabel, BATTERY_FLOW_LABELS[direction] || 'IDLE');
+    }
+    setText(DOM.batterySoc, battery.soc != null ? `${battery.soc.toFixed(1)} %` : '-- %');
+    setText(DOM.batteryPower, battery.power != null ? `${Math.round(battery.power)} W` : '-- W');
+    setText(DOM.batteryGuard, `${data.battery_priority_soc ?? '--'} %`);
+}
+
+function energyFingerprint(data, map) {
+    const history = map.history || [];
+    const latest = history[history.length - 1];
+    const steps = map.evse_steps || [];
+    return history.length + '|' + (map.last_ts_ms ?? latest?.ts_ms ?? latest?.ts ?? '') + '|' + steps.length + '|'
+        + data.current_amps + '|' + data.target_current;
+}
+
+function applyData(data) {
+    const map = data.energy_map || {};
+    // Rail, timeline and chart only depend on the energy map; skip them when it is unchanged.
+    const fingerprint = energyFingerprint(data, map);
+    const energyChanged = fingerprint !== lastEnergyFingerprint;
+    lastEnergyFingerprint = fingerprint;
+    // Plan now, write on the next frame: payloads that arrive before it collapse into the
+    // latest one, and every DOM write lands in a single layout pass.
+    pendingRender = { data, map, energy: energyChanged || Boolean(pendingRender?.energy) };
+    if (!renderFrame) renderFrame = requestAnimationFrame(flushRender);
+    return energyChanged;
+}
+
+function flushRender() {
+    renderFrame = 0;
+    const { data, map, energy } = pendingRender;
+    pendingRender = null;
+    updateMetrics(data);
+    updateConstraints(data.limiting_factors || []);
+    updateBattery(data);
+    updateEnergyChips(data);
+    if (!energy) return;
+    renderRail(map.evse_steps || [], data.current_amps, data.target_current);
+    updateTimeline((map.history || []).slice(-TIMELINE_LIMIT).reverse());
+    pumpChart(map.history || [], data.available_power, data.pv_power_w || data.total_pv_power, data.charging_power);
+}
+
+function fetchStatus() {
+    // Callers that overlap a slow request share its result instead of stacking fetches.
+    if (!statusInFlight) {
+        statusInFlight = (async () => {
+            try {
+                // Revalidate by hand so an unchanged snapshot surfaces as a 304 and skips parsing.
+                const response = await fetch(URLS.status, {
+                    cache: 'no-store',
+                    headers: statusEtag ? { 'If-None-Match': statusEtag } : {},
+                });
+                if (response.status === 304) return false;
+                if (!response.ok) throw new Error('bad status');
+                statusEtag = response.headers.get('ETag');
+                return applyData(await response.json());
+            } catch (error) {
+                console.error('Status fetch failed', error);
+                statusEtag = null;
+                applyData(FALLBACK);
+                return false;
+            } finally {
+                statusInFlight = null;
+            }
+        })();
+    }
+    return statusInFlight;
+}
+
+function schedulePoll(delay) {
+    clearTimeout(pollTimer);
+    pollTimer = setTimeout(pollLoop, delay);
+}
+
+async function pollLoop() {
+    const changed = await fetchStatus();
+    // The event stream delivers updates while it is connected; hidden tabs go quiet
+    // until they are shown again.
+    if (streaming || document.hidden) return;
+    // Back off gently while the controller reports nothing new.
+    pollDelay = changed ? POLL_BASE_MS : Math.min(pollDelay * 1.5, POLL_IDLE_MAX_MS);
+    schedulePoll(pollDelay);
+}
+
+function mergeStatus(state, delta) {
+    const { energy_map: mapDelta, history_append: appended, history_size: size, ...changed } = delta;
+    const next = { ...state, ...changed };
+    if (mapDelta) {
+        const map = { ...state.energy_map, ...mapDelta };
+        if (appended) {
+            // slice(-0) would keep everything; an emptied window must come back empty.
+            map.history = size ? (state.energy_map?.history || []).concat(appended).slice(-size) : [];
+        }
+        next.energy_map = map;
+    }
+    return next;
+}
+
+function startStream() {
+    if (typeof EventSource === 'undefined' || eventSource) return;
+    const source = eventSource = new EventSource(URLS.stream);
+    source.onopen = () => {
+        streaming = true;
+        clearTimeout(pollTimer);
+    };
+    source.onmessage = event => {
+        try {
+            streamState = JSON.parse(event.data);
+            applyData(streamState);
+        } catch (error) {
+            console.error('Bad status event', error);
+        }
+    };
+    source.addEventListener('delta', event => {
+        // Deltas build on the last full frame of this connection; a reconnect starts with a new one.
+        if (!streamState) return;
+        try {
+            streamState = mergeStatus(streamState, JSON.parse(event.data));
+            applyData(streamState);
+        } catch (error) {
+            console.error('Bad status delta', error);
+        }
+    });
+    source.onerror = () => {
+        // EventSource reconnects by itself; poll in the meantime.
+        if (!streaming) return;
+        streaming = false;
+        schedulePoll(POLL_BASE_MS);
+    };
+}
+
+function stopStream() {
+    if (!eventSource) return;
+    eventSource.close();
+    eventSource = null;
+    streamState = null;
+    streaming = false;
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.hidden) {
+        clearTimeout(pollTimer);
+        stopStream();
+        return;
+    }
+    pollDelay = POLL_BASE_MS;
+    schedulePoll(POLL_COALESCE_MS);
+    startStream();
+});
+
+cacheDom();
+initChartWhenVisible();
+pollLoop();
+// A tab opened in the background subscribes once it is first shown.
+if (!document.hidden) startStream();
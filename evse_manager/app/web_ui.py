@@ -1,14 +1,43 @@
 """Cyberpunk-inspired visualization for the deterministic EVSE controller."""
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
-from copy import deepcopy
+import re
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator, Optional, Tuple
 
-from flask import Flask, jsonify, render_template_string
+from flask import Flask, Response, request
+
+try:  # Brotli is optional; without it the page is served gzip or identity.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the image
+    brotli = None
 
 app = Flask(__name__)
 
+UI_STATE_PATH = Path("/data/ui_state.json")
+
+# Responses smaller than this are not worth the gzip framing overhead.
+GZIP_MIN_SIZE = 512
+
+# Server-sent event stream tuning: how often to check for a new snapshot, how long
+# an idle stream may stay silent, and when to recycle the connection (the browser
+# reconnects on its own after STREAM_RETRY_MS).
+STREAM_POLL_S = 0.5
+STREAM_HEARTBEAT_S = 15.0
+STREAM_MAX_AGE_S = 300.0
+STREAM_RETRY_MS = 2000
+
+# Each stream holds a server thread for its lifetime. run.sh starts gunicorn with 8
+# threads; leave two for the page, assets and status polls. Clients turned away fall
+# back to polling.
+STREAM_MAX_CLIENTS = 6
+
 FALLBACK_PAYLOAD = {
     "status": "idle",
     "mode": "auto",
@@ -32,740 +61,301 @@ FALLBACK_PAYLOAD = {
     },
 }
 
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang=\"en\">
-<head>
-    <meta charset=\"UTF-8\">
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
-    <title>EVSE LCARS Console</title>
-    <link rel=\"preconnect\" href=\"https://fonts.googleapis.com\">
-    <link rel=\"preconnect\" href=\"https://fonts.gstatic.com\" crossorigin>
-    <link href=\"https://fonts.googleapis.com/css2?family=Rajdhani:wght@400;600&family=Space+Grotesk:wght@400;500&display=swap\" rel=\"stylesheet\">
-    <script src=\"https://cdn.jsdelivr.net/npm/chart.js@4.4.6/dist/chart.umd.min.js\"></script>
-    <style>
-        :root {
-            --lcars-bg: #050408;
-            --lcars-panel: #0f0c1a;
-            --lcars-dark: #120d1f;
-            --lcars-amber: #f7a21c;
-            --lcars-pink: #f04c7c;
-            --lcars-cyan: #5de0ec;
-            --lcars-violet: #b48bff;
-            --lcars-muted: #8f8ba5;
-            --lcars-text: #f4f2ff;
-        }
-        * { box-sizing: border-box; }
-        body {
-            margin: 0;
-            min-height: 100vh;
-            font-family: 'Rajdhani', 'Space Grotesk', 'Segoe UI', sans-serif;
-            background: radial-gradient(circle at 20% 20%, rgba(244,162,28,0.12), transparent 55%),
-                        radial-gradient(circle at 70% 0%, rgba(93,224,236,0.18), transparent 50%),
-                        var(--lcars-bg);
-            color: var(--lcars-text);
-        }
-        body::before {
-            content: '';
-            position: fixed;
-            inset: 0;
-            background-image: linear-gradient(rgba(255,255,255,0.015) 1px, transparent 1px),
-                              linear-gradient(90deg, rgba(255,255,255,0.015) 1px, transparent 1px);
-            background-size: 120px 120px;
-            pointer-events: none;
-        }
-        main {
-            padding: clamp(16px, 4vw, 48px);
-        }
-        .lcars-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 28px;
-            gap: 12px;
-        }
-        .lcars-title {
-            font-size: clamp(28px, 5vw, 54px);
-            letter-spacing: 0.32em;
-            color: var(--lcars-amber);
-        }
-        .lcars-header::after {
-            content: '';
-            flex: 1;
-            height: 6px;
-            background: linear-gradient(90deg, var(--lcars-amber), var(--lcars-pink));
-            border-radius: 999px;
-            margin-left: 18px;
-        }
-        .status-badge {
-            padding: 12px 20px;
-            border-radius: 999px;
-            background: var(--lcars-panel);
-            border: 2px solid var(--lcars-pink);
-            letter-spacing: 0.3em;
-            font-size: 12px;
-        }
-        .mode-chip {
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            padding: 6px 14px;
-            border-radius: 999px;
-            font-size: 11px;
-            letter-spacing: 0.3em;
-            background: rgba(93,224,236,0.15);
-            border: 1px solid rgba(93,224,236,0.5);
-            color: var(--lcars-cyan);
-            margin-bottom: 18px;
-            text-transform: uppercase;
-        }
-        .mode-chip.probe {
-            background: rgba(240,76,124,0.15);
-            border-color: rgba(240,76,124,0.6);
-            color: var(--lcars-pink);
-        }
-        .lcars-grid {
-            display: grid;
-            grid-template-columns: minmax(240px, 280px) minmax(320px, 1fr) minmax(260px, 320px);
-            gap: 20px;
-        }
-        .lcars-stack, .lcars-bridge, .lcars-side {
-            display: flex;
-            flex-direction: column;
-            gap: 18px;
-        }
-        .stack-segment {
-            background: var(--lcars-panel);
-            padding: 18px;
-            border-radius: 32px 12px 12px 32px;
-            border-left: 12px solid var(--lcars-amber);
-            border-right: 2px solid rgba(255,255,255,0.08);
-            min-height: 80px;
-        }
-        .segment-title {
-            font-size: 11px;
-            letter-spacing: 0.4em;
-            text-transform: uppercase;
-            color: var(--lcars-muted);
-        }
-        .segment-value {
-            font-size: 28px;
-            letter-spacing: 0.2em;
-            margin-top: 6px;
-        }
-        .segment-subtext {
-            font-size: 13px;
-            color: var(--lcars-muted);
-            min-height: 18px;
-        }
-        .segment-foot {
-            margin-top: 10px;
-        }
-        .lcars-rail {
-            display: flex;
-            gap: 8px;
-            flex-wrap: nowrap;
-            overflow-x: auto;
-            padding: 6px;
-            background: var(--lcars-dark);
-            border-radius: 32px;
-            border: 1px solid rgba(255,255,255,0.05);
-        }
-        .rail-step {
-            flex: 1;
-            min-width: 80px;
-            padding: 10px 12px;
-            border-radius: 18px;
-            text-align: center;
-            background: rgba(255,255,255,0.04);
-            border: 1px solid transparent;
-            transition: transform 0.2s ease;
-        }
-        .rail-step.active {
-            background: var(--lcars-amber);
-            color: #130a05;
-            border-color: rgba(0,0,0,0.2);
-        }
-        .rail-step.target {
-        .auto-status-row {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            margin-bottom: 10px;
-        }
-        .status-chip {
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            padding: 8px 14px;
-            border-radius: 999px;
-            border: 1px solid rgba(255,255,255,0.15);
-            letter-spacing: 0.25em;
-            font-size: 11px;
-            text-transform: uppercase;
-            background: rgba(255,255,255,0.05);
-        }
-        .status-chip.active {
-            border-color: var(--lcars-amber);
-            color: var(--lcars-amber);
-        }
-        .status-chip.alert {
-            border-color: var(--lcars-pink);
-            color: var(--lcars-pink);
-        }
-            border-color: var(--lcars-pink);
-        }
-        .rail-step small {
-            display: block;
-            letter-spacing: 0.2em;
-            font-size: 11px;
-            color: rgba(255,255,255,0.6);
-        }
-        .panel {
-            background: var(--lcars-panel);
-            border-radius: 28px;
-            padding: 20px;
-            border: 1px solid rgba(255,255,255,0.08);
-            position: relative;
-            overflow: hidden;
-        }
-        .panel::after {
-            content: '';
-            position: absolute;
-            inset: 6px;
-            border-radius: 20px;
-            border: 1px solid rgba(255,255,255,0.05);
-            pointer-events: none;
-        }
-        .panel-title {
-            font-size: 12px;
-            letter-spacing: 0.5em;
-            text-transform: uppercase;
-            margin-bottom: 12px;
-            color: var(--lcars-muted);
-        }
-        .metric-board {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(130px, 1fr));
-            gap: 12px;
-        }
-        .metric {
-            background: rgba(255,255,255,0.02);
-            border-radius: 16px;
-            padding: 12px 14px;
-            border: 1px solid rgba(255,255,255,0.04);
-        }
-        .metric span:first-child {
-            font-size: 11px;
-            letter-spacing: 0.3em;
-            color: var(--lcars-muted);
-        }
-        .metric strong {
-            display: block;
-            font-size: clamp(16px, 2.8vw, 26px);
-            margin-top: 6px;
-            letter-spacing: 0.15em;
-            white-space: nowrap;
-            overflow: hidden;
-            text-overflow: ellipsis;
-        }
-        .auto-help {
-            margin-top: 12px;
-            font-size: 13px;
-            color: var(--lcars-muted);
-            line-height: 1.4;
-        }
-        .timeline-list {
-            list-style: none;
-            margin: 0;
-            padding: 0;
-            max-height: 220px;
-            overflow-y: auto;
-            display: flex;
-            flex-direction: column;
-            gap: 10px;
-        }
-        .timeline-list li {
-            display: flex;
-            justify-content: space-between;
-            gap: 12px;
-            background: rgba(0,0,0,0.18);
-            border-radius: 14px;
-            padding: 10px 12px;
-            font-size: 13px;
-        }
-        .constraint-list {
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-        }
-        .constraint {
-            padding: 10px 14px;
-            border-radius: 20px;
-            border: 1px solid rgba(255,255,255,0.07);
-            background: rgba(255,255,255,0.03);
-            letter-spacing: 0.2em;
-            font-size: 11px;
-            text-transform: uppercase;
-            white-space: nowrap;
-            overflow: hidden;
-            text-overflow: ellipsis;
-        }
-        .constraint.alert {
-            border-color: var(--lcars-pink);
-            color: var(--lcars-pink);
-        }
-        .battery-grid {
-            display: grid;
-            grid-template-columns: repeat(2, minmax(0, 1fr));
-            gap: 10px;
-        }
-        .battery-aura {
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            margin-bottom: 12px;
-        }
-        .battery-beacon {
-            width: 32px;
-            height: 32px;
-            border-radius: 50%;
-            background: rgba(255,255,255,0.08);
-            border: 1px solid rgba(255,255,255,0.2);
-            box-shadow: 0 0 12px rgba(255,255,255,0.15);
-            position: relative;
-            transition: box-shadow 0.3s ease, background 0.3s ease, border-color 0.3s ease;
-        }
-        .battery-beacon::after {
-            content: '';
-            position: absolute;
-            inset: 6px;
-            border-radius: 50%;
-            background: rgba(255,255,255,0.2);
-        }
-        .battery-beacon.charging {
-            background: rgba(93,224,236,0.2);
-            border-color: #5de0ec;
-            box-shadow: 0 0 20px rgba(93,224,236,0.45);
-        }
-        .battery-beacon.discharging {
-            background: rgba(240,76,124,0.18);
-            border-color: var(--lcars-pink);
-            box-shadow: 0 0 20px rgba(240,76,124,0.4);
-        }
-        .battery-beacon-label {
-            display: flex;
-            flex-direction: column;
-        }
-        .battery-beacon-label span {
-            display: block;
-            font-size: 9px;
-            letter-spacing: 0.35em;
-            color: var(--lcars-muted);
-        }
-        .battery-beacon-label strong {
-            letter-spacing: 0.25em;
-            font-size: 16px;
-        }
-        canvas { width: 100% !important; height: 220px !important; }
-        @media (max-width: 1100px) {
-            .lcars-grid { grid-template-columns: 1fr; }
-        }
-    </style>
-</head>
-<body>
-    <main>
-        <div class=\"lcars-header\">
-            <div class=\"lcars-title\">EVSE LCARS</div>
-            <div class=\"status-badge\" id=\"status-chip\">INITIALIZING</div>
-        </div>
-        <div class=\"lcars-grid\">
-            <section class=\"lcars-stack\">
-                <div class=\"stack-segment\">
-                    <div class=\"segment-title\">MODE</div>
-                    <div class=\"segment-value\">
-                        <span id=\"mode-value\">AUTO</span>
-                        <span class=\"mode-chip\" id=\"mode-region-chip\">MAIN</span>
-                    </div>
-                    <div class=\"segment-subtext\" id=\"mode-subtext\">Deterministic FSM</div>
-                    <div class=\"segment-foot\">
-                        <span class=\"mode-chip\" id=\"mode-state-chip\">IDLE</span>
-                    </div>
-                </div>
-                <div class=\"stack-segment\">
-                    <div class=\"segment-title\">STATE</div>
-                    <div class=\"segment-value\" id=\"auto-state\">IDLE</div>
-                    <div class=\"segment-subtext\" id=\"state-help\">Awaiting telemetry</div>
-                </div>
-                <div class=\"stack-segment\">
-                    <div class=\"segment-title\">CHARGER</div>
-                    <div class=\"segment-value\" id=\"charger-status\">UNKNOWN</div>
-                    <div class=\"segment-subtext\" id=\"limiter-label\">CLEAR</div>
-                </div>
-                <div class=\"stack-segment\">
-                    <div class=\"segment-title\">CURRENT / TARGET</div>
-                    <div class=\"segment-value\"><span id=\"current-amps\">0 A</span> · <span id=\"target-amps\">0 A</span></div>
-                    <div class=\"segment-subtext\" id=\"step-indicator\">EVSE STEP 0</div>
-                </div>
-            </section>
-            <section class=\"lcars-bridge\">
-                <div class=\"lcars-rail\" id=\"step-rail\"></div>
-                <article class=\"panel\">
-                    <div class=\"panel-title\">ENERGY SYNTHESIS</div>
-                    <canvas id=\"energy-chart\"></canvas>
-                    <div class=\"metric-board\" style=\"margin-top:14px;\">
-                        <div class=\"metric\"><span>AVAILABLE</span><strong id=\"available-chip\">-- W</strong></div>
-                        <div class=\"metric\"><span>PV ARRAY</span><strong id=\"pv-chip\">-- W</strong></div>
-                        <div class=\"metric\"><span>INVERTER</span><strong id=\"load-chip\">-- W</strong></div>
-                    <p class="auto-help" id="control-target-label">Target: --</p>
-                    <p class="auto-help" id="control-reason-label">Reason: --</p>
-                        <div class=\"metric\"><span>EV DRAW</span><strong id=\"ev-draw-chip\">-- W</strong></div>
-                    </div>
-                </article>
-                <article class=\"panel\">
-                    <div class=\"panel-title\">TEMPORAL TRACE</div>
-                    <ul class=\"timeline-list\" id=\"timeline\"></ul>
-                </article>
-            </section>
-            <section class=\"lcars-side\">
-                <article class=\"panel\">
-                    <div class=\"panel-title\">AUTO LOGIC</div>
-                    <div class=\"auto-status-row\">
-                        <span class=\"status-chip\" id=\"fsm-status-chip\">FSM | IDLE</span>
-                        <span class=\"status-chip\" id=\"evse-status-chip\">EVSE | UNKNOWN</span>
-                    </div>
-                    <p class=\"auto-help\" id=\"auto-help\">State narrative will appear here.</p>
-                </article>
-                <article class=\"panel\">
-                    <div class=\"panel-title\">CONSTRAINT STACK</div>
-                    <div class=\"constraint-list\" id=\"constraint-chips\"></div>
-                </article>
-                <article class=\"panel\">
-                    <div class=\"panel-title\">BATTERY + GUARD</div>
-                    <div class=\"battery-aura\">
-                        <div class=\"battery-beacon\" id=\"battery-beacon\"></div>
-                        <div class=\"battery-beacon-label\">
-                            <span>FLOW</span>
-                            <strong id=\"battery-beacon-label\">IDLE</strong>
-                        </div>
-                    </div>
-                    <div class="battery-grid">
-                        <div class="metric"><span>SOC</span><strong id="battery-soc">-- %</strong></div>
-                        <div class="metric"><span>POWER</span><strong id="battery-power">-- W</strong></div>
-                        <div class="metric"><span>GUARD</span><strong id="battery-guard">-- %</strong></div>
-                    </div>
-                </article>
-            </section>
-        </div>
-    </main>
-    <script>
-        const FALLBACK = {{ fallback_json | safe }};
-        const ingressMatch = window.location.pathname.match(/^\/api\/hassio_ingress\/[A-Za-z0-9_-]+/);
-        const basePath = ingressMatch ? ingressMatch[0] : '';
-        const apiFetch = (path, options) => fetch(`${basePath}${path}`, options);
-        let energyChart;
-
-        function initChart() {
-            const ctx = document.getElementById('energy-chart');
-            if (!ctx) return;
-            energyChart = new Chart(ctx, {
-                type: 'line',
-                data: {
-                    labels: [],
-                    datasets: [
-                        { label: 'Available', data: [], borderColor: '#f7a21c', backgroundColor: 'rgba(247,162,28,0.15)', fill: true, tension: 0.35 },
-                        { label: 'PV', data: [], borderColor: '#5de0ec', borderDash: [8,4], tension: 0.35 },
-                        { label: 'EV Draw', data: [], borderColor: '#f04c7c', tension: 0.35 }
-                    ]
-                },
-                options: {
-                    animation: false,
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: { 
-                        legend: { 
-                            labels: { 
-                                color: 'rgba(244,242,255,0.8)', 
-                                font: { family: 'Rajdhani', size: 11 }
-                            } 
-                        } 
-                    },
-                    scales: {
-                        x: {
-                            display: false
-                        },
-                        y: { 
-                            ticks: { 
-                                color: 'rgba(244,242,255,0.6)',
-                                font: { size: 10 }
-                            }, 
-                            grid: { color: 'rgba(255,255,255,0.05)' } 
-                        }
-                    }
-                }
-            });
-        }
-
-        function fmt(value, suffix = '') {
-            if (typeof value !== 'number' || Number.isNaN(value)) return `--${suffix}`;
-            return `${Math.round(value)}${suffix}`;
-        }
-
-        function findStepIndex(steps, amps) {
-            if (!steps?.length || amps == null) return -1;
-            const rounded = Math.round(amps);
-            return steps.findIndex(step => Math.round(step.amps) === rounded);
-        }
-
-        function renderRail(steps, currentAmps, targetAmps) {
-            const rail = document.getElementById('step-rail');
-            rail.innerHTML = '';
-            if (!steps?.length) {
-                rail.innerHTML = '<div class="rail-step">NO STEPS</div>';
-                return;
-            }
-            const currentIndex = findStepIndex(steps, currentAmps);
-            const targetIndex = findStepIndex(steps, targetAmps);
-            steps.forEach((step, index) => {
-                const div = document.createElement('div');
-                div.className = 'rail-step';
-                if (index === currentIndex) div.classList.add('active');
-                if (index === targetIndex && index !== currentIndex) div.classList.add('target');
-                div.innerHTML = `<small>${index}</small>${step.amps}A`;
-                rail.appendChild(div);
-            });
-            const indicator = document.getElementById('step-indicator');
-            indicator.textContent = currentIndex >= 0 ? `STEP ${currentIndex}` : 'STEP ?';
-        }
-
-        function updateTimeline(history) {
-            const list = document.getElementById('timeline');
-            list.innerHTML = '';
-            if (!history?.length) {
-                list.innerHTML = '<li><span>No telemetry yet</span><span>--</span></li>';
-                return;
-            }
-            history.slice(-8).reverse().forEach(sample => {
-                const ts = sample.ts ? new Date(sample.ts) : null;
-                const label = ts ? ts.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit', second: '2-digit' }) : '--';
-                const payload = `Avail ${fmt(sample.available, 'W')} / Curr ${fmt(sample.current, 'W')} / Target ${fmt(sample.target, 'W')}`;
-                const li = document.createElement('li');
-                li.innerHTML = `<span>${label}</span><span>${payload}</span>`;
-                list.appendChild(li);
-            });
-        }
-
-        function updateConstraints(limiting) {
-            const host = document.getElementById('constraint-chips');
-            host.innerHTML = '';
-            if (!limiting?.length) {
-                const span = document.createElement('div');
-                span.className = 'constraint';
-                span.textContent = 'CLEAR CHANNEL';
-                host.appendChild(span);
-                return;
-            }
-            limiting.forEach(item => {
-                const span = document.createElement('div');
-                span.className = 'constraint alert';
-                span.textContent = item.replace(/_/g, ' ');
-                host.appendChild(span);
-            });
-        }
-
-        function pumpChart(history, availablePower, pvPower, chargingPower) {
-            if (!energyChart) return;
-            // Use empty strings as labels since x-axis is hidden
-            const labels = history.map(() => '');
-            energyChart.data.labels = labels;
-            energyChart.data.datasets[0].data = history.map(sample => sample.available ?? availablePower ?? null);
-            energyChart.data.datasets[1].data = history.map(sample => sample.pv ?? pvPower ?? null);
-            energyChart.data.datasets[2].data = history.map(sample => sample.current ?? chargingPower ?? null);
-            energyChart.update('none');
-        }
-
-        function updateMetrics(data) {
-            document.getElementById('status-chip').textContent = (data.status || 'idle').toUpperCase();
-            document.getElementById('mode-value').textContent = (data.mode || 'auto').toUpperCase();
-            document.getElementById('auto-state').textContent = data.auto_state_label || '--';
-            document.getElementById('state-help').textContent = data.auto_state_help || 'Awaiting telemetry';
-            document.getElementById('charger-status').textContent = (data.charger_status || '--').toUpperCase();
-            document.getElementById('limiter-label').textContent = (data.limiting_factors?.[0] || 'Clear channel').replace(/_/g, ' ');
-            document.getElementById('current-amps').textContent = `${data.current_amps ?? 0} A`;
-            document.getElementById('target-amps').textContent = `${data.target_current ?? 0} A`;
-            document.getElementById('auto-help').textContent = data.auto_state_help || 'No guidance available.';
-            updateModeChips(data);
-            updateStatusChips(data);
-            updateControlNarrative(data);
-        }
-
-        function updateModeChips(data) {
-            const regionChip = document.getElementById('mode-region-chip');
-            const modeStateChip = document.getElementById('mode-state-chip');
-            const modeSubtext = document.getElementById('mode-subtext');
-            if (regionChip) {
-                const region = (data.region || 'main').toUpperCase();
-                regionChip.textContent = region;
-                regionChip.classList.toggle('probe', region === 'PROBE');
-            }
-            if (modeStateChip) {
-                const state = (data.mode_state || '--').replace(/_/g, ' ').toUpperCase();
-                modeStateChip.textContent = state;
-            }
-            if (modeSubtext) {
-                modeSubtext.textContent = data.mode_state ? data.mode_state.replace(/_/g, ' ').toUpperCase() : 'DETERMINISTIC FSM';
-            }
-        }
-
-        function updateControlNarrative(data) {
-            const target = document.getElementById('control-target-label');
-            const reason = document.getElementById('control-reason-label');
-            if (target) {
-                const label = data.control_target_label || 'Target unavailable';
-                target.textContent = `Target: ${label}`;
-            }
-            if (reason) {
-                const why = data.control_reason_label || 'Awaiting telemetry';
-                reason.textContent = `Reason: ${why}`;
-            }
-        }
-
-        function updateStatusChips(data) {
-            const fsmChip = document.getElementById('fsm-status-chip');
-            if (fsmChip) {
-                fsmChip.textContent = `FSM | ${(data.auto_state_label || '--').toUpperCase()}`;
-                fsmChip.classList.remove('active', 'alert');
-                if ((data.auto_state || '').includes('charging')) {
-                    fsmChip.classList.add('active');
-                }
-            }
-            const evseChip = document.getElementById('evse-status-chip');
-            if (evseChip) {
-                const evseState = (data.charger_status || 'unknown').toUpperCase();
-                evseChip.textContent = `EVSE | ${evseState}`;
-                evseChip.classList.remove('active', 'alert');
-                const normalized = evseState.toLowerCase();
-                if (/(ready|charging|active)/.test(normalized)) {
-                    evseChip.classList.add('active');
-                }
-                if (/(fault|error|unavailable)/.test(normalized)) {
-                    evseChip.classList.add('alert');
-                }
-            }
-        }
-
-        function updateEnergyChips(data) {
-            // Display "Available for EV" - show "Probing" when in PROBE region (SOC >= 95%)
-            const availableChip = document.getElementById('available-chip');
-            if (data.ui_available_for_ev === null || data.ui_available_for_ev === undefined) {
-                const region = (data.region || '').toUpperCase();
-                availableChip.textContent = region === 'PROBE' ? 'Probing' : 'Unknown';
-            } else {
-                availableChip.textContent = fmt(data.ui_available_for_ev, ' W');
-            }
-            
-            // Display PV Array (Total PV Power)
-            const pvChip = document.getElementById('pv-chip');
-            const pv = data.ui_pv_display ?? data.pv_power_w ?? data.total_pv_power;
-            pvChip.textContent = fmt(pv, ' W');
-            
-            document.getElementById('load-chip').textContent = fmt(data.inverter_power, ' W');
-            document.getElementById('ev-draw-chip').textContent = fmt(data.charging_power, ' W');
-        }
-
-        function updateBattery(data) {
-            const battery = data.battery || {};
-            const beacon = document.getElementById('battery-beacon');
-            const beaconLabel = document.getElementById('battery-beacon-label');
-            const direction = (battery.direction || 'idle').toLowerCase();
-            if (beacon) {
-                beacon.classList.remove('charging', 'discharging');
-                if (direction === 'charging') {
-                    beacon.classList.add('charging');
-                } else if (direction === 'discharging') {
-                    beacon.classList.add('discharging');
-                }
-            }
-            if (beaconLabel) {
-                const label = direction === 'charging' ? 'IN' : direction === 'discharging' ? 'OUT' : 'IDLE';
-                beaconLabel.textContent = label;
-            }
-            document.getElementById('battery-soc').textContent = battery.soc != null ? `${battery.soc.toFixed(1)} %` : '-- %';
-            document.getElementById('battery-power').textContent = battery.power != null ? `${Math.round(battery.power)} W` : '-- W';
-            document.getElementById('battery-guard').textContent = `${data.battery_priority_soc ?? '--'} %`;
-        }
-
-        function applyData(data) {
-            updateMetrics(data);
-            updateConstraints(data.limiting_factors || []);
-            updateBattery(data);
-            updateEnergyChips(data);
-
-            const map = data.energy_map || {};
-            renderRail(map.evse_steps || [], data.current_amps, data.target_current);
-            updateTimeline(map.history || []);
-            pumpChart(map.history || [], data.available_power, data.pv_power_w || data.total_pv_power, data.charging_power);
-        }
-
-        async function fetchStatus() {
-            try {
-                const response = await apiFetch('/api/status');
-                if (!response.ok) throw new Error('bad status');
-                applyData(await response.json());
-            } catch (error) {
-                console.error('Status fetch failed', error);
-                applyData(FALLBACK);
-            }
-        }
-
-        initChart();
-        fetchStatus();
-        setInterval(fetchStatus, 2000);
-    </script>
-</body>
-</html>
-"""
+FALLBACK_BODY = json.dumps(FALLBACK_PAYLOAD, separators=(",", ":")).encode("utf-8")
+
+# Free /api/stream slots; a slot is released when its response is closed.
+_stream_slots = threading.BoundedSemaphore(STREAM_MAX_CLIENTS)
+
+# Last served (version, body, gzip body) for /api/status and the event stream.
+_status_cache: Tuple[Optional[str], bytes, Optional[bytes]] = (None, b"", None)
+
+
+@dataclass(frozen=True)
+class StaticBody:
+    """A response body pre-compressed once at import in every encoding we can serve."""
+
+    mimetype: str
+    identity: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+    etag: str
+
+
+def _precompress(body: bytes, mimetype: str) -> StaticBody:
+    return StaticBody(
+        mimetype=mimetype,
+        identity=body,
+        gzip=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli=brotli.compress(body, quality=11, mode=brotli.MODE_TEXT) if brotli else None,
+        etag=hashlib.md5(body).hexdigest(),
+    )
+
+
+def _static_response(static: StaticBody, cache_control: str) -> Response:
+    """Serve a pre-compressed body in the best encoding the client accepts."""
+
+    if static.brotli is not None and _accepts_encoding("br"):
+        response = Response(static.brotli, mimetype=static.mimetype)
+        response.headers["Content-Encoding"] = "br"
+    elif _accepts_encoding("gzip"):
+        response = Response(static.gzip, mimetype=static.mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(static.identity, mimetype=static.mimetype)
+    # All encodings share one entity tag; revisits revalidate to an empty 304.
+    response.set_etag(static.etag, weak=True)
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Accept-Encoding")
+    return response.make_conditional(request)
+
+
+def _strip_lines(source: str) -> str:
+    """Drop indentation, blank lines and whole-line // comments; line breaks are kept for ASI."""
+
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+def _minify_css(source: str) -> str:
+    """Strip comments and collapse whitespace, including around block and list punctuation."""
+
+    css = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+# Stylesheet and script are content-addressed so browsers can cache them indefinitely;
+# only the small HTML shell is revalidated on reload.
+TEMPLATE_DIR = Path(app.root_path) / app.template_folder
+_css = _minify_css((TEMPLATE_DIR / "dashboard.css").read_text("utf-8")).encode("utf-8")
+_js = _strip_lines(
+    app.jinja_env.get_template("dashboard.js").render(fallback_json=FALLBACK_BODY.decode("utf-8"))
+).encode("utf-8")
+CSS_ASSET = f"app.{hashlib.md5(_css).hexdigest()[:10]}.css"
+JS_ASSET = f"app.{hashlib.md5(_js).hexdigest()[:10]}.js"
+ASSETS = {
+    CSS_ASSET: _precompress(_css, "text/css"),
+    JS_ASSET: _precompress(_js, "text/javascript"),
+}
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+INDEX_PAGE = _precompress(
+    _strip_lines(
+        app.jinja_env.get_template("index.html").render(
+            css_href=f"assets/{CSS_ASSET}", js_href=f"assets/{JS_ASSET}"
+        )
+    ).encode("utf-8"),
+    "text/html",
+)
 
 
 @app.route("/")
 def index():
-    """Render the neon dashboard."""
+    """Serve the pre-rendered dashboard shell."""
 
-    return render_template_string(HTML_TEMPLATE, fallback_json=json.dumps(FALLBACK_PAYLOAD))
+    return _static_response(INDEX_PAGE, "no-cache")
 
 
-def _fallback_payload():
-    """Return a deep copy of the fallback payload so callers can mutate safely."""
+@app.route("/assets/<name>")
+def asset(name: str):
+    """Serve a content-addressed stylesheet or script."""
 
-    return deepcopy(FALLBACK_PAYLOAD)
+    static = ASSETS.get(name)
+    if static is None:
+        return Response(status=404)
+    return _static_response(static, ASSET_CACHE_CONTROL)
 
 
-def _load_ui_state_payload():
-    """Load the persisted UI state, tolerating empty or partially-written files."""
+def _load_ui_state_body() -> bytes:
+    """Return the persisted UI state as served bytes, or the fallback when unavailable.
+
+    The controller replaces ui_state.json atomically, so the file is passed through
+    without a decode/encode round-trip.
+    """
 
-    data_file = Path("/data/ui_state.json")
-    if not data_file.exists():
-        return _fallback_payload()
     try:
-        raw = data_file.read_text(encoding="utf-8").strip()
+        body = UI_STATE_PATH.read_bytes()
+    except FileNotFoundError:
+        return FALLBACK_BODY
     except OSError as exc:  # file temporarily unavailable, etc.
         app.logger.warning("Unable to read ui_state.json (%s); serving fallback", exc)
-        return _fallback_payload()
-    if not raw:
-        app.logger.warning("ui_state.json empty; serving fallback")
-        return _fallback_payload()
+        return FALLBACK_BODY
+    if not body.lstrip().startswith(b"{"):
+        app.logger.warning("ui_state.json empty or invalid; serving fallback")
+        return FALLBACK_BODY
+    return body
+
+
+def _accepts_encoding(encoding: str) -> bool:
+    """Whether Accept-Encoding allows the coding, honouring q-values (q=0 refuses it)."""
+
+    return request.accept_encodings[encoding] > 0
+
+
+def _ui_state_version() -> Optional[str]:
+    """Identify the current ui_state.json revision from stat metadata, without reading it."""
+
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError as exc:
-        app.logger.warning("ui_state.json invalid JSON (%s); serving fallback", exc)
-        return _fallback_payload()
+        stat = UI_STATE_PATH.stat()
+    except OSError:
+        return None
+    # The controller renames a fresh file into place, so the inode changes on every write
+    # even when mtime granularity is coarse.
+    return f"{stat.st_ino:x}-{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _status_snapshot(version: Optional[str]) -> Tuple[bytes, Optional[bytes]]:
+    """Return the status body and its gzip form, reading and compressing once per file version.
+
+    Concurrent pollers and streams share the cached pair; a race at worst repeats the read.
+    """
+
+    global _status_cache
+    cached = _status_cache
+    if version is not None and cached[0] == version:
+        return cached[1], cached[2]
+    body = _load_ui_state_body()
+    packed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+    if version is not None:
+        _status_cache = (version, body, packed)
+    return body, packed
+
+
+def _json_response(
+    body: bytes, etag: Optional[str] = None, packed: Optional[bytes] = None
+) -> Response:
+    """Wrap a JSON body with a weak ETag, answering 304 or gzip when the client allows."""
+
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag or hashlib.md5(body).hexdigest(), weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    response.make_conditional(request)
+    if response.status_code == 200 and packed is not None and _accepts_encoding("gzip"):
+        response.set_data(packed)
+        response.headers["Content-Encoding"] = "gzip"
+    return response
 
 
 @app.route("/api/status")
 def api_status():
     """Return the latest controller snapshot or a deterministic fallback."""
 
-    return jsonify(_load_ui_state_payload())
+    version = _ui_state_version()
+    if version is not None and request.if_none_match.contains_weak(version):
+        # Idle polls are answered from a stat() alone; the file is only read when it changed.
+        return _json_response(b"", version)
+    body, packed = _status_snapshot(version)
+    return _json_response(body, version, packed)
+
+
+def _history_append(previous: list, current: list) -> Optional[list]:
+    """Return the samples appended to a rolling history window, or None if it did not just slide."""
+
+    if not previous:
+        return current
+    last_ts = previous[-1].get("ts_ms")
+    if last_ts is None:
+        return None
+    appended = 0
+    while appended < len(current) and (current[-1 - appended].get("ts_ms") or 0) > last_ts:
+        appended += 1
+    kept = len(current) - appended
+    if kept > len(previous) or current[:kept] != previous[len(previous) - kept:]:
+        return None
+    return current[kept:]
+
+
+def _status_delta(previous: dict, current: dict) -> Optional[dict]:
+    """Describe `current` as changes against `previous`, or None when a full frame is needed.
+
+    Unchanged fields are omitted, including inside energy_map; its rolling history is sent
+    as the newly appended samples plus the window size.
+    """
+
+    if previous.keys() != current.keys():
+        return None
+    delta = {
+        key: value for key, value in current.items() if key != "energy_map" and previous[key] != value
+    }
+    prev_map = previous.get("energy_map")
+    cur_map = current.get("energy_map")
+    if prev_map == cur_map:
+        return delta
+    if not isinstance(prev_map, dict) or not isinstance(cur_map, dict) or prev_map.keys() - cur_map.keys():
+        return None
+    map_delta = {
+        key: value for key, value in cur_map.items() if key != "history" and prev_map.get(key) != value
+    }
+    history = cur_map.get("history") or []
+    if (prev_map.get("history") or []) != history:
+        appended = _history_append(prev_map.get("history") or [], history)
+        # A cleared window has nothing to append to; send it whole.
+        if appended is None or not history:
+            map_delta["history"] = history
+        else:
+            delta["history_append"] = appended
+            delta["history_size"] = len(history)
+    delta["energy_map"] = map_delta
+    return delta
+
+
+def _status_events() -> Iterator[str]:
+    """Yield an SSE frame whenever the controller rewrites ui_state.json.
+
+    The first frame carries the full snapshot; later ones are "delta" events holding only
+    what changed since the previous frame on this connection.
+    """
+
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+    started = last_sent = time.monotonic()
+    last_version: object = object()
+    previous: Optional[dict] = None
+    while True:
+        now = time.monotonic()
+        if now - started >= STREAM_MAX_AGE_S:
+            return
+        version = _ui_state_version()
+        if version != last_version:
+            last_version = version
+            body = _status_snapshot(version)[0].decode("utf-8")
+            try:
+                current = json.loads(body)
+            except ValueError:
+                current = None
+            delta = None
+            if previous is not None and current is not None:
+                delta = _status_delta(previous, current)
+            previous = current
+            if delta is None:
+                yield f"data: {body}\n\n"
+                last_sent = now
+            elif delta:
+                yield f"event: delta\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n"
+                last_sent = now
+        elif now - last_sent >= STREAM_HEARTBEAT_S:
+            # Comment frames keep proxies from idling out the connection and surface dead clients.
+            yield ": keepalive\n\n"
+            last_sent = now
+        time.sleep(STREAM_POLL_S)
+
+
+@app.route("/api/stream")
+def api_stream():
+    """Push controller snapshots to the dashboard as server-sent events.
+
+    When every stream slot is taken the answer is 204, which tells EventSource to stop
+    reconnecting so the page stays on polling.
+    """
+
+    slots = _stream_slots
+    if not slots.acquire(blocking=False):
+        return Response(status=204)
+    response = Response(_status_events(), mimetype="text/event-stream")
+    response.call_on_close(slots.release)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 def run_server(host: str = "0.0.0.0", port: int = 5000) -> None:
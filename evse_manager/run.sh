@@ -22,7 +22,9 @@ if bashio::config.true 'ui_access_logs'; then
 	ACCESS_LOG_ARGS="--access-logfile -"
 fi
 cd /app
-python3 -m gunicorn -w 1 -b 0.0.0.0:5000 web_ui:app ${ACCESS_LOG_ARGS} --error-logfile - &
+# gthread worker: each /api/stream subscriber holds a thread for the life of the stream;
+# web_ui.STREAM_MAX_CLIENTS keeps two of the 8 threads free for everything else
+python3 -m gunicorn -w 1 --threads 8 -b 0.0.0.0:5000 web_ui:app ${ACCESS_LOG_ARGS} --error-logfile - &
 
 # Small delay to let web server start
 sleep 2
@@ -0,0 +1,118 @@
+"""Tests for the controller's UI snapshot persistence."""
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+APP_DIR = Path(__file__).resolve().parents[1] / "evse_manager" / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import controller_service  # noqa: E402  # pylint: disable=wrong-import-position
+from state_machine import ControllerConfig  # noqa: E402  # pylint: disable=wrong-import-position
+
+START = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_service() -> controller_service.ControlService:
+    """Build a service with just the state the UI helpers use, skipping Home Assistant setup."""
+
+    service = controller_service.ControlService.__new__(controller_service.ControlService)
+    service.runtime_config = SimpleNamespace(controller=ControllerConfig())
+    service.energy_history = deque(maxlen=controller_service.HISTORY_LIMIT)
+    return service
+
+
+def append_samples(service: controller_service.ControlService, count: int) -> None:
+    for i in range(count):
+        service._append_history(START + timedelta(seconds=i), 1000.0, 2000.0, 500.0, 1380.0, 1380.0)
+
+
+class UiStateFileTests(unittest.TestCase):
+    """Serialization and atomic publication of ui_state.json."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_path = Path(tmp.name) / "data" / "ui_state.json"
+        tmp_path = self.state_path.with_name("ui_state.json.tmp")
+        for name, value in (("UI_STATE_PATH", self.state_path), ("UI_STATE_TMP_PATH", tmp_path)):
+            patcher = mock.patch.object(controller_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_dump_is_compact_json(self):
+        """Snapshots are written without whitespace and decode back to the payload."""
+
+        payload = {"mode": "auto", "battery": {"soc": 80.5}, "limiting_factors": []}
+        data = controller_service.dump_ui_state(payload)
+        self.assertNotIn(b" ", data)
+        self.assertEqual(json.loads(data), payload)
+
+    def test_write_creates_directory_and_replaces_file(self):
+        """The first write creates the data directory; later writes replace the snapshot."""
+
+        controller_service.write_ui_state(b'{"a":1}')
+        controller_service.write_ui_state(b'{"a":2}')
+        self.assertEqual(self.state_path.read_bytes(), b'{"a":2}')
+        self.assertEqual(list(self.state_path.parent.iterdir()), [self.state_path])
+
+    def test_short_writes_are_completed(self):
+        """A write that stops short is resumed, so the published file is never truncated."""
+
+        real_write = controller_service.os.write
+        with mock.patch.object(
+            controller_service.os, "write", side_effect=lambda fd, data: real_write(fd, data[:3])
+        ) as write:
+            controller_service.write_ui_state(b'{"mode":"auto"}')
+        self.assertEqual(self.state_path.read_bytes(), b'{"mode":"auto"}')
+        self.assertEqual(write.call_count, 5)
+
+
+class EnergyMapTests(unittest.TestCase):
+    """History fields the dashboard and its event stream rely on."""
+
+    def test_samples_carry_epoch_milliseconds(self):
+        """Each sample has ts_ms matching its ISO timestamp."""
+
+        service = make_service()
+        append_samples(service, 1)
+        sample = service.energy_history[0]
+        self.assertEqual(sample["ts_ms"], int(START.timestamp() * 1000))
+        self.assertEqual(datetime.fromisoformat(sample["ts"]), START)
+
+    def test_history_is_bounded(self):
+        """Only the newest HISTORY_LIMIT samples are kept."""
+
+        service = make_service()
+        append_samples(service, controller_service.HISTORY_LIMIT + 5)
+        history = service._energy_map(0.0, 0.0, None)["history"]
+        self.assertEqual(len(history), controller_service.HISTORY_LIMIT)
+        self.assertEqual(history[0]["ts_ms"], int((START + timedelta(seconds=5)).timestamp() * 1000))
+
+    def test_last_ts_ms_is_newest_sample(self):
+        """last_ts_ms names the newest sample; the dashboard derives its trace from history."""
+
+        service = make_service()
+        append_samples(service, 11)
+        energy_map = service._energy_map(0.0, 0.0, None)
+        self.assertEqual(energy_map["last_ts_ms"], energy_map["history"][-1]["ts_ms"])
+        self.assertNotIn("timeline", energy_map)
+
+    def test_empty_history(self):
+        """Before the first tick the map has no samples and no last timestamp."""
+
+        energy_map = make_service()._energy_map(0.0, 0.0, None)
+        self.assertEqual(energy_map["history"], [])
+        self.assertIsNone(energy_map["last_ts_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,313 @@
+"""Tests for the web UI endpoints."""
+from __future__ import annotations
+
+import copy
+import dataclasses
+import gzip
+import json
+import sys
+import tempfile
+import unittest
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+APP_DIR = Path(__file__).resolve().parents[1] / "evse_manager" / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+import controller_service  # noqa: E402
+import web_ui  # noqa: E402
+from state_machine import ControllerConfig  # noqa: E402
+
+
+def make_payload(samples: int = 40) -> dict:
+    payload = copy.deepcopy(web_ui.FALLBACK_PAYLOAD)
+    payload["energy_map"]["history"] = [
+        {"ts_ms": 1_700_000_000_000 + i * 1500, "available": 1200.0, "pv": 3000.0, "current": 1380}
+        for i in range(samples)
+    ]
+    return payload
+
+
+def make_body(samples: int = 40) -> bytes:
+    return json.dumps(make_payload(samples), separators=(",", ":")).encode("utf-8")
+
+
+class IndexTests(unittest.TestCase):
+    """Serving of the pre-rendered dashboard page."""
+
+    def test_index_precompressed_when_accepted(self):
+        """The gzip body decompresses to exactly the plain page."""
+
+        client = web_ui.app.test_client()
+        plain = client.get("/")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertIn(f'src="assets/{web_ui.JS_ASSET}"'.encode(), plain.data)
+
+        packed = client.get("/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(packed.headers.get("Content-Encoding"), "gzip")
+        self.assertIn("Accept-Encoding", packed.headers.get("Vary", ""))
+        self.assertEqual(gzip.decompress(packed.data), plain.data)
+
+    def test_index_prefers_brotli_when_available(self):
+        """With a Brotli body built, clients offering br get it ahead of gzip."""
+
+        client = web_ui.app.test_client()
+        page = dataclasses.replace(web_ui.INDEX_PAGE, brotli=b"br-body")
+        with mock.patch.object(web_ui, "INDEX_PAGE", page):
+            response = client.get("/", headers={"Accept-Encoding": "gzip, deflate, br"})
+            gzip_only = client.get("/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers.get("Content-Encoding"), "br")
+        self.assertEqual(response.data, b"br-body")
+        self.assertEqual(gzip_only.headers.get("Content-Encoding"), "gzip")
+
+    def test_index_respects_refused_encodings(self):
+        """Codings offered with q=0 are refused, so the page falls back to identity."""
+
+        client = web_ui.app.test_client()
+        response = client.get("/", headers={"Accept-Encoding": "gzip;q=0, identity"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn(b"<html", response.data)
+
+    def test_index_revalidates_to_304(self):
+        """A reload carrying the page ETag gets an empty 304."""
+
+        client = web_ui.app.test_client()
+        etag = client.get("/").headers["ETag"]
+        again = client.get("/", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.data, b"")
+
+
+class AssetTests(unittest.TestCase):
+    """Serving of the content-addressed stylesheet and script."""
+
+    def test_assets_are_immutable(self):
+        """Hashed assets carry a long-lived immutable cache policy."""
+
+        client = web_ui.app.test_client()
+        script = client.get(f"/assets/{web_ui.JS_ASSET}")
+        self.assertEqual(script.status_code, 200)
+        self.assertIn("immutable", script.headers["Cache-Control"])
+        self.assertIn(b"const FALLBACK = {", script.data)
+        self.assertEqual(client.get(f"/assets/{web_ui.CSS_ASSET}").mimetype, "text/css")
+
+    def test_unknown_asset_is_404(self):
+        """Stale or made-up asset names are not served."""
+
+        client = web_ui.app.test_client()
+        self.assertEqual(client.get("/assets/app.0000000000.js").status_code, 404)
+
+
+class StatusEndpointTests(unittest.TestCase):
+    """Conditional GET and compression behaviour of /api/status."""
+
+    def setUp(self):
+        self.client = web_ui.app.test_client()
+        patcher = mock.patch.object(web_ui, "_load_ui_state_body", side_effect=make_body)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unchanged_status_returns_304(self):
+        """A poll carrying the previous ETag gets an empty 304."""
+
+        first = self.client.get("/api/status")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+
+        second = self.client.get("/api/status", headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+
+    def test_status_gzipped_when_accepted(self):
+        """Large payloads are gzip encoded for clients that ask for it."""
+
+        response = self.client.get("/api/status", headers={"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.data)), make_payload())
+
+        plain = self.client.get("/api/status")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(plain.get_json(), make_payload())
+
+
+class StatusFileTests(unittest.TestCase):
+    """How /api/status passes ui_state.json through."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_path = Path(tmp.name) / "ui_state.json"
+        for name, value in (("UI_STATE_PATH", self.state_path), ("_status_cache", (None, b"", None))):
+            patcher = mock.patch.object(web_ui, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = web_ui.app.test_client()
+
+    def test_state_file_served_verbatim(self):
+        """The persisted bytes are returned without being re-serialized."""
+
+        body = b'{"mode": "auto",  "charger_status": "charging"}'
+        self.state_path.write_bytes(body)
+        self.assertEqual(self.client.get("/api/status").data, body)
+
+    def test_unchanged_file_answered_without_reading(self):
+        """A poll matching the file's stat-based ETag gets a 304 without opening the file."""
+
+        self.state_path.write_bytes(make_body(3))
+        etag = self.client.get("/api/status").headers["ETag"]
+
+        with mock.patch.object(web_ui, "_load_ui_state_body") as load:
+            response = self.client.get("/api/status", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        load.assert_not_called()
+
+        self.state_path.write_bytes(make_body(4))
+        self.assertEqual(self.client.get("/api/status", headers={"If-None-Match": etag}).status_code, 200)
+
+    def test_unchanged_file_read_once(self):
+        """Repeated full fetches of one file version reuse the cached body."""
+
+        self.state_path.write_bytes(make_body(3))
+        with mock.patch.object(web_ui, "_load_ui_state_body", wraps=web_ui._load_ui_state_body) as load:
+            first = self.client.get("/api/status")
+            second = self.client.get("/api/status")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(load.call_count, 1)
+
+    def test_missing_or_empty_file_serves_fallback(self):
+        """A missing or blank state file falls back to the default payload."""
+
+        self.assertEqual(self.client.get("/api/status").data, web_ui.FALLBACK_BODY)
+        self.state_path.write_bytes(b"")
+        self.assertEqual(self.client.get("/api/status").data, web_ui.FALLBACK_BODY)
+
+
+class StatusStreamTests(unittest.TestCase):
+    """Server-sent event stream behaviour of /api/stream."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_path = Path(tmp.name) / "ui_state.json"
+        self.state_path.write_text(json.dumps(make_payload(3)), encoding="utf-8")
+        patcher = mock.patch.object(web_ui, "UI_STATE_PATH", self.state_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = web_ui.app.test_client()
+
+    def test_stream_emits_current_snapshot_first(self):
+        """The first data frame carries the snapshot currently on disk."""
+
+        response = self.client.get("/api/stream", buffered=False)
+        self.addCleanup(response.close)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        frames = iter(response.response)
+        self.assertTrue(next(frames).startswith(b"retry:"))
+        frame = next(frames).decode()
+        self.assertTrue(frame.startswith("data: "))
+        self.assertEqual(json.loads(frame[len("data: "):]), make_payload(3))
+
+    def test_later_frames_carry_only_changes(self):
+        """After the first snapshot, the stream sends appended samples and changed fields."""
+
+        poll = mock.patch.object(web_ui, "STREAM_POLL_S", 0)
+        poll.start()
+        self.addCleanup(poll.stop)
+        response = self.client.get("/api/stream", buffered=False)
+        self.addCleanup(response.close)
+        frames = iter(response.response)
+        next(frames), next(frames)
+
+        updated = make_payload(4)
+        updated["energy_map"]["history"] = updated["energy_map"]["history"][1:]
+        updated["current_amps"] = 10
+        staged = self.state_path.with_suffix(".tmp")
+        staged.write_text(json.dumps(updated), encoding="utf-8")
+        staged.replace(self.state_path)
+
+        event, data = next(frames).decode().rstrip("\n").split("\n")
+        self.assertEqual(event, "event: delta")
+        self.assertEqual(
+            json.loads(data[len("data: "):]),
+            {
+                "current_amps": 10,
+                "history_append": updated["energy_map"]["history"][-1:],
+                "history_size": 3,
+                "energy_map": {},
+            },
+        )
+
+    def test_streams_beyond_the_cap_get_204(self):
+        """With every stream slot taken, new subscribers are told to stop and poll instead."""
+
+        slots = mock.patch.object(web_ui, "_stream_slots", web_ui.threading.BoundedSemaphore(1))
+        slots.start()
+        self.addCleanup(slots.stop)
+        first = self.client.get("/api/stream", buffered=False)
+        try:
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(self.client.get("/api/stream", buffered=False).status_code, 204)
+        finally:
+            first.close()
+        again = self.client.get("/api/stream", buffered=False)
+        self.addCleanup(again.close)
+        self.assertEqual(again.status_code, 200)
+
+
+class StatusDeltaTests(unittest.TestCase):
+    """Change encoding used by the event stream."""
+
+    def test_reshaped_history_is_sent_whole(self):
+        """History that is not a plain slide of the previous window is resent in full."""
+
+        previous, current = make_payload(3), make_payload(3)
+        current["energy_map"]["history"][0]["available"] = 0.0
+        delta = web_ui._status_delta(previous, current)
+        self.assertEqual(delta, {"energy_map": {"history": current["energy_map"]["history"]}})
+
+    def test_emptied_history_is_sent_whole(self):
+        """A window cleared to nothing is sent as an empty history, not an empty append."""
+
+        current = make_payload(0)
+        delta = web_ui._status_delta(make_payload(3), current)
+        self.assertEqual(delta, {"energy_map": {"history": []}})
+
+    def test_controller_tick_delta_is_small(self):
+        """One controller tick on a full history window encodes to a few hundred bytes."""
+
+        service = controller_service.ControlService.__new__(controller_service.ControlService)
+        service.runtime_config = SimpleNamespace(controller=ControllerConfig())
+        service.energy_history = deque(maxlen=controller_service.HISTORY_LIMIT)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        def tick(i: int) -> dict:
+            available = 1200.5 + i
+            service._append_history(start + timedelta(seconds=5 * i), available, 3400.7, 2100.0, 1380.0, 1610.0)
+            payload = copy.deepcopy(web_ui.FALLBACK_PAYLOAD)
+            payload["available_power"] = available
+            payload["energy_map"] = service._energy_map(1380.0, 1610.0, available)
+            return json.loads(controller_service.dump_ui_state(payload))
+
+        for i in range(controller_service.HISTORY_LIMIT + 10):
+            previous = tick(i)
+        current = tick(controller_service.HISTORY_LIMIT + 10)
+
+        delta = web_ui._status_delta(previous, current)
+        self.assertEqual(delta["history_append"], current["energy_map"]["history"][-1:])
+        self.assertEqual(set(delta["energy_map"]), {"last_ts_ms", "available_power"})
+        self.assertLess(len(json.dumps(delta, separators=(",", ":"))), 400)
+
+    def test_changed_field_set_needs_full_frame(self):
+        """Added or removed top-level fields fall back to a full snapshot."""
+
+        current = make_payload(3)
+        current["new_field"] = 1
+        self.assertIsNone(web_ui._status_delta(make_payload(3), current))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)